@@ -2,13 +2,17 @@
 import tempfile
 from go2pdb.go import uniprot
 import logging
+import os
 import argparse
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from tempfile import NamedTemporaryFile, TemporaryDirectory
+from tempfile import NamedTemporaryFile
 import pandas as pd
 import numpy as np
-from . import pdb, blast, cluster
+import openpyxl
+from . import pdb, blast, cluster, cache
 from .go import goa
 
 
@@ -19,14 +23,57 @@ BLAST_IDENTITY_CUTOFF = 0.8
 CLUSTER_IDENTITY_CUTOFF = 0.9
 DATA_DIR = Path("data")
 GOA_PATH = DATA_DIR / Path("goa_pdb.gaf.gz")
+CACHE_DIR = DATA_DIR / Path("cache")
 SEARCH_OUTPUT = Path("search-output.xlsx")
 BLAST_OUTPUT = Path("blast-output.xlsx")
 CLUSTER_OUTPUT = Path("cluster-output.xlsx")
 SUMMARY_OUTPUT = Path("summary-output.xlsx")
+EXCEL_SHEET = "Sheet1"
+FASTA_BUFFER_SIZE = 1 << 20
+CATEGORY_COLUMNS = (
+    "PDB method",
+    "PDB strand type",
+    "GOA evidence",
+    "GOA assigned by",
+    "GOA qualifiers",
+)
+SEARCH_PDB_COLUMNS = (
+    "PDB ID",
+    "PDB description",
+    "PDB title",
+    "PDB deposit date",
+    "PDB method",
+    "PDB resolution (A)",
+)
+SEARCH_KEYWORD_COLUMNS = ("PDB keyword match",)
+SEARCH_CHAIN_COLUMNS = (
+    "PDB chain ID",
+    "PDB strand ID(s)",
+    "PDB strand type",
+    "PDB strand sequence",
+    "UniProt entry ID",
+    "UniProt entry name",
+    "UniProt protein names",
+    "UniProt GO code",
+)
+SEARCH_GOA_COLUMNS = (
+    "GOA qualifiers",
+    "GOA GO code",
+    "GOA DB reference",
+    "GOA evidence",
+    "GOA additional evidence",
+    "GOA taxon ID",
+    "GOA annotation date",
+    "GOA assigned by",
+)
 
 
+@lru_cache(maxsize=None)
 def build_parser() -> argparse.ArgumentParser:
-    """Build an argument parser."""
+    """Build an argument parser.
+
+    The parser is only constructed once; later calls return the same object.
+    """
     parser = argparse.ArgumentParser(
         "Find PDB entries with GO annotations and keywords.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
@@ -70,6 +117,21 @@ def build_parser() -> argparse.ArgumentParser:
             "not trust the completeness of GO annotations"
         ),
     )
+    search_parser.add_argument(
+        "--cache-dir",
+        help="Directory for cached PDB metadata and UniProt mappings",
+        default=CACHE_DIR,
+    )
+    search_parser.add_argument(
+        "--cache-ttl-days",
+        help=(
+            "Number of days to keep cached PDB metadata and UniProt mappings "
+            "(requires the diskcache package). Set to zero to disable "
+            "caching."
+        ),
+        default=cache.CACHE_TTL_DAYS,
+        type=float,
+    )
     search_parser.add_argument(
         "--output-path",
         help="Path for Excel-format search output.",
@@ -120,6 +182,26 @@ def build_parser() -> argparse.ArgumentParser:
         dest="blast_raw_output",
         nargs=1,
     )
+    blast_parser.add_argument(
+        "--engine",
+        help=(
+            "Alignment engine. The plastp engine uses the SIMD-accelerated "
+            "PLAST program (if installed in your path) instead of BLAST."
+        ),
+        choices=blast.ENGINES,
+        default="blastp",
+        dest="blast_engine",
+    )
+    blast_parser.add_argument(
+        "--num-workers",
+        help=(
+            "Number of BLAST queries to run in parallel (or number of "
+            "threads for PLAST)."
+        ),
+        default=os.cpu_count(),
+        dest="blast_num_workers",
+        type=int,
+    )
     blast_parser.add_argument(
         "--identity-cutoff",
         help=(
@@ -204,116 +286,288 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _fill_missing(df) -> pd.DataFrame:
+    """Replace None with NaN in object columns (as pd.read_excel does).
+
+    :param pd.DataFrame df:  DataFrame to fix
+    :returns:  DataFrame with NaN for missing values
+    """
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].where(df[column].notna(), np.nan)
+    return df
+
+
+def _column_names(header) -> list:
+    """Name Excel columns the way pd.read_excel does.
+
+    Empty header cells become "Unnamed: N" and repeated names get ".1",
+    ".2", etc. suffixes, skipping suffixed names already in the header.
+
+    :param tuple header:  header row values
+    :returns:  list of unique column names
+    """
+    names = [
+        f"Unnamed: {icol}" if name is None else str(name)
+        for icol, name in enumerate(header)
+    ]
+    columns = list(names)
+    counts = {}
+    for icol, name in enumerate(names):
+        count = counts.get(name, 0)
+        column = name
+        while count > 0:
+            counts[name] = count + 1
+            column = f"{name}.{count}"
+            if column in names:
+                count += 1
+            else:
+                count = counts.get(column, 0)
+        columns[icol] = column
+        counts[column] = count + 1
+    return columns
+
+
+def _trim_row(row) -> tuple:
+    """Remove trailing empty cells from an Excel row.
+
+    :param tuple row:  row values
+    :returns:  row without trailing None values
+    """
+    row = tuple(row)
+    end = len(row)
+    while end > 0 and row[end - 1] is None:
+        end -= 1
+    return row[:end]
+
+
+def _read_excel(path) -> pd.DataFrame:
+    """Read the first sheet of an Excel file into a DataFrame.
+
+    The workbook is streamed in openpyxl read-only mode rather than loaded
+    into the full openpyxl object model.  Column naming and the handling of
+    cells beyond the header follow pd.read_excel.
+
+    :param Path path:  path to Excel-format input
+    :returns:  DataFrame with the contents of the first sheet
+    """
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = _trim_row(next(rows, ()))
+        values = [[] for _ in header]
+        num_rows = 0
+        last_row = 0
+        for row in rows:
+            row = _trim_row(row)
+            if len(row) > len(values):
+                values += [
+                    [None] * num_rows for _ in range(len(row) - len(values))
+                ]
+            num_rows += 1
+            if row:
+                last_row = num_rows
+            row = row + (None,) * (len(values) - len(row))
+            for column, value in zip(values, row):
+                column.append(value)
+    finally:
+        workbook.close()
+    header = header + (None,) * (len(values) - len(header))
+    df = pd.DataFrame(
+        {icol: column[:last_row] for icol, column in enumerate(values)}
+    )
+    df.columns = _column_names(header)
+    return _fill_missing(df.infer_objects())
+
+
+def _write_excel(df, path):
+    """Write a DataFrame to an Excel file.
+
+    Uses the Rust-backed ``rustpy_xlsxwriter`` package if it is installed and
+    falls back to :meth:`pandas.DataFrame.to_excel` otherwise.
+
+    :param pd.DataFrame df:  DataFrame to write
+    :param Path path:  path for Excel-format output
+    """
+    try:
+        from rustpy_xlsxwriter import FastExcel
+    except ImportError:
+        _LOGGER.debug("rustpy_xlsxwriter not available; using pandas.")
+        df.to_excel(path, sheet_name=EXCEL_SHEET, index=False)
+        return
+    FastExcel(str(path)).sheet(EXCEL_SHEET, df).save()
+
+
+def _write_results(df, path):
+    """Write results to Excel along with a Parquet copy for later steps.
+
+    :param pd.DataFrame df:  DataFrame to write
+    :param Path path:  path for Excel-format output
+    """
+    _write_excel(df, path)
+    parquet_path = Path(path).with_suffix(".parquet")
+    try:
+        df.to_parquet(parquet_path, index=False)
+    except ImportError:
+        _LOGGER.debug("No Parquet engine; not writing %s.", parquet_path)
+    except (TypeError, ValueError) as err:
+        _LOGGER.warning("Unable to write %s: %s", parquet_path, err)
+
+
+def _read_results(path) -> pd.DataFrame:
+    """Read results from a previous step.
+
+    Prefers the Parquet copy written by :func:`_write_results` as long as it
+    is not older than the Excel file (e.g., after the user edited the
+    spreadsheet).
+
+    :param Path path:  path to Excel-format input
+    :returns:  DataFrame with results
+    """
+    path = Path(path)
+    parquet_path = path.with_suffix(".parquet")
+    if parquet_path.exists() and (
+        not path.exists()
+        or parquet_path.stat().st_mtime >= path.stat().st_mtime
+    ):
+        _LOGGER.debug("Reading Parquet copy %s.", parquet_path)
+        return _fill_missing(pd.read_parquet(parquet_path))
+    return _read_excel(path)
+
+
 def do_blast(args):
     """Perform BLAST all-vs.-all comparison.
 
     :param argparse.Namespace args:  command-line arguments
     """
-    _LOGGER.info(f"Reading search output from {args.blast_input_path}.")
-    search_df = pd.read_excel(args.blast_input_path)
-    fasta = blast.build_fasta(search_df)
-    temp_dir = TemporaryDirectory()
-    if args.fasta_path is not None:
-        fasta_path = args.fasta_path
-    else:
-        fasta_path = Path(temp_dir.name) / Path("sequences.fasta")
-    _LOGGER.info(f"Writing sequence data to {fasta_path}.")
-    with open(fasta_path, "wt") as fasta_file:
-        fasta_file.write(fasta)
-    if args.blast_db_dir is not None:
-        blast_dir = Path(args.blast_db_dir)
-    else:
-        blast_dir = Path(temp_dir.name)
-    _LOGGER.info(f"Building BLAST database in {blast_dir}.")
-    blast.build_db(fasta_path, blast_dir)
-    print(args)
-    if args.blast_raw_output is not None:
-        save_output = Path(args.blast_raw_output[0])
-    else:
-        save_output = None
-    df = blast.run_blast(
-        fasta_path,
-        blast_dir,
-        identity_cutoff=args.blast_identity_cutoff,
-        similarity_cutoff=args.blast_similarity_cutoff,
-        save_output=save_output,
-    )
-    _LOGGER.info(f"Saving BLAST results to {args.blast_output_path}.")
-    df.to_excel(Path(args.blast_output_path))
+    _LOGGER.info("Reading search output from %s.", args.blast_input_path)
+    search_df = _read_results(args.blast_input_path)
+    with blast.temporary_directory() as temp_dir:
+        if args.fasta_path is not None:
+            fasta_path = Path(args.fasta_path)
+        else:
+            fasta_path = Path(temp_dir) / Path("sequences.fasta")
+        _LOGGER.info("Writing sequence data to %s.", fasta_path)
+        with open(fasta_path, "wt", buffering=FASTA_BUFFER_SIZE) as fasta_file:
+            fasta_file.writelines(blast.build_fasta(search_df))
+        if args.blast_db_dir is not None:
+            blast_dir = Path(args.blast_db_dir)
+        else:
+            blast_dir = Path(temp_dir)
+        engine = blast.resolve_engine(args.blast_engine)
+        if engine == "blastp":
+            _LOGGER.info("Building BLAST database in %s.", blast_dir)
+            blast.build_db(fasta_path, blast_dir)
+        if args.blast_raw_output is not None:
+            save_output = Path(args.blast_raw_output[0])
+        else:
+            save_output = None
+        df = blast.run_blast(
+            fasta_path,
+            blast_dir,
+            identity_cutoff=args.blast_identity_cutoff,
+            similarity_cutoff=args.blast_similarity_cutoff,
+            save_output=save_output,
+            engine=engine,
+            num_workers=args.blast_num_workers,
+        )
+    _LOGGER.info("Saving BLAST results to %s.", args.blast_output_path)
+    _write_results(df, args.blast_output_path)
+
+
+def _categorize(df) -> pd.DataFrame:
+    """Convert low-cardinality string columns to categorical dtype.
+
+    :param pd.DataFrame df:  DataFrame with (some of) CATEGORY_COLUMNS
+    :returns:  DataFrame with categorical columns
+    """
+    for column in CATEGORY_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype("category")
+    return df
+
+
+def _search_goa(args) -> pd.DataFrame:
+    """Fetch (if needed) and search the local GOA database.
+
+    :param argparse.Namespace args:  command-line arguments
+    :returns:  DataFrame with GOA entries matching the GO codes
+    """
+    goa.check_fetch(args.local_goa_path)
+    goa_df = goa.extract(args.local_goa_path, args.go_codes)
+    object_ids = goa_df["GOA DB object ID"].to_numpy(dtype=str)
+    parts = np.char.partition(object_ids, "_")
+    goa_df["PDB ID"] = np.char.upper(parts[:, 0])
+    goa_df["Chain ID"] = parts[:, 2]
+    goa_df = goa_df.drop(["GOA DB object ID"], axis=1)
+    return _categorize(goa_df)
 
 
 def do_search(args):
     """Perform search.
 
+    The PDB keyword and GOA searches do not depend on the UniProt results so
+    they run in background threads while UniProt is queried.
+
     :param argparse.Namespace args:  command-line arguments
     """
-    _LOGGER.info(f"Searching UniProt for GO codes {args.go_codes}.")
-    uniprot_df = uniprot.search_go(args.go_codes, ssl_verify=args.working_ssl)
-    _LOGGER.info(f"Found {len(uniprot_df)} UniProt IDs.")
-    _LOGGER.info("Searching for PDB IDs matching UniProt IDs.")
-    pdb_mapping_df = uniprot.get_pdb_ids(
-        uniprot_df["UniProt entry ID"].values, ssl_verify=args.working_ssl
-    )
-    _LOGGER.info(f"Found {len(pdb_mapping_df)} PDB IDs.")
-    df = uniprot_df.merge(pdb_mapping_df, how="right", on="UniProt entry ID")
-    if args.pdb_keyword:
-        _LOGGER.info(f"Searching PDB for keyword {args.pdb_keyword}.")
-        pdb_df = pdb.keyword_search(
-            args.pdb_keyword, ssl_verify=args.working_ssl
+    with ThreadPoolExecutor() as executor:
+        if args.pdb_keyword:
+            _LOGGER.info("Searching PDB for keyword %s.", args.pdb_keyword)
+            keyword_future = executor.submit(
+                pdb.keyword_search,
+                args.pdb_keyword,
+                ssl_verify=args.working_ssl,
+            )
+        if args.search_goa:
+            _LOGGER.info("Searching GOA.")
+            goa_future = executor.submit(_search_goa, args)
+        _LOGGER.info("Searching UniProt for GO codes %s.", args.go_codes)
+        uniprot_df = uniprot.search_go(
+            args.go_codes, ssl_verify=args.working_ssl
         )
-        _LOGGER.info(f"Found {len(pdb_df)} PDB IDs.")
-        df = df.merge(pdb_df, how="outer", on="PDB ID")
-        _LOGGER.info(f"Have {len(df)} entries.")
-    if args.search_goa:
-        _LOGGER.info("Searching GOA.")
-        goa.check_fetch(args.local_goa_path)
-        goa_df = goa.extract(args.local_goa_path, args.go_codes)
-        split_df = goa_df["GOA DB object ID"].str.split("_", expand=True)
-        goa_df["PDB ID"] = split_df[0].str.upper()
-        goa_df["Chain ID"] = split_df[1]
-        goa_df = goa_df.drop(["GOA DB object ID"], axis=1)
-        df = df.merge(goa_df, how="outer", on="PDB ID")
-        _LOGGER.info(f"Have {len(df)} entries.")
-    pdb_ids = set(df["PDB ID"].values)
+        _LOGGER.info("Found %d UniProt IDs.", len(uniprot_df))
+        _LOGGER.info("Searching for PDB IDs matching UniProt IDs.")
+        pdb_mapping_df = cache.get_pdb_ids(
+            uniprot_df["UniProt entry ID"].values,
+            ssl_verify=args.working_ssl,
+            cache_dir=args.cache_dir,
+            ttl_days=args.cache_ttl_days,
+        )
+        _LOGGER.info("Found %d PDB IDs.", len(pdb_mapping_df))
+        df = uniprot_df.merge(
+            pdb_mapping_df, how="right", on="UniProt entry ID"
+        )
+        if args.pdb_keyword:
+            pdb_df = keyword_future.result()
+            _LOGGER.info("Found %d PDB IDs for keyword.", len(pdb_df))
+            df = df.merge(pdb_df, how="outer", on="PDB ID")
+            _LOGGER.info("Have %d entries.", len(df))
+        if args.search_goa:
+            goa_df = goa_future.result()
+            df = df.merge(goa_df, how="outer", on="PDB ID")
+            _LOGGER.info("Have %d entries.", len(df))
+    pdb_ids = pd.unique(df["PDB ID"].dropna())
     _LOGGER.info("Adding PDB metadata.")
-    meta_df = pdb.metadata(pdb_ids, ssl_verify=args.working_ssl)
+    meta_df = cache.metadata(
+        pdb_ids,
+        ssl_verify=args.working_ssl,
+        cache_dir=args.cache_dir,
+        ttl_days=args.cache_ttl_days,
+    )
+    meta_df = _categorize(meta_df)
     df = df.merge(meta_df, how="left", on="PDB ID")
-    column_list = [
-        "PDB ID",
-        "PDB description",
-        "PDB title",
-        "PDB deposit date",
-        "PDB method",
-        "PDB resolution (A)",
-    ]
+    column_list = list(SEARCH_PDB_COLUMNS)
     if args.pdb_keyword:
-        column_list += ["PDB keyword match"]
-    column_list += [
-        "PDB chain ID",
-        "PDB strand ID(s)",
-        "PDB strand type",
-        "PDB strand sequence",
-        "UniProt entry ID",
-        "UniProt entry name",
-        "UniProt protein names",
-        "UniProt GO code",
-    ]
+        column_list += SEARCH_KEYWORD_COLUMNS
+    column_list += SEARCH_CHAIN_COLUMNS
     if args.search_goa:
-        column_list += [
-            "GOA qualifiers",
-            "GOA GO code",
-            "GOA DB reference",
-            "GOA evidence",
-            "GOA additional evidence",
-            "GOA taxon ID",
-            "GOA annotation date",
-            "GOA assigned by",
-        ]
+        column_list += SEARCH_GOA_COLUMNS
+    # Deduplicate before projecting so only unique rows are copied
+    df = df.drop_duplicates(subset=column_list, ignore_index=True)
     df = df[column_list]
-    df = df.drop_duplicates()
-    _LOGGER.info(f"Have {len(df)} entries.")
-    _LOGGER.info(f"Writing results to {args.search_output_path}.")
-    df.to_excel(args.search_output_path, index=False)
+    _LOGGER.info("Have %d entries.", len(df))
+    _LOGGER.info("Writing results to %s.", args.search_output_path)
+    _write_results(df, args.search_output_path)
 
 
 def do_cluster(args):
@@ -322,23 +576,25 @@ def do_cluster(args):
     :param argparse.Namespace args:  command-line arguments
     """
     blast_path = Path(args.cluster_input_path)
-    _LOGGER.info(f"Clustering BLAST results from {blast_path}.")
-    df = pd.read_excel(blast_path)
-    _LOGGER.info(f"Read {len(df)} results.")
+    _LOGGER.info("Clustering BLAST results from %s.", blast_path)
+    df = _read_results(blast_path)
+    _LOGGER.info("Read %d results.", len(df))
     cutoff = args.cluster_metric_cutoff
     if args.cluster_metric == "identity":
-        _LOGGER.info(f"Removing results with identity below {cutoff}.")
+        _LOGGER.info("Removing results with identity below %s.", cutoff)
         df = df[df["Alignment frac. identity"] >= cutoff]
     elif args.cluster_metric == "similarity":
-        _LOGGER.info(f"Removing results with similarity below {cutoff}.")
+        _LOGGER.info("Removing results with similarity below %s.", cutoff)
         df = df[df["Alignment frac. similarity"] >= cutoff]
     else:
         err = f"Unknown clustering metric: {args.cluster_metric}."
         raise ValueError(err)
-    _LOGGER.info(f"Have {len(df)} results remaining.")
+    _LOGGER.info("Have %d results remaining.", len(df))
     clusters = cluster.cluster(df)
     cluster_df = cluster.transform_clusters(clusters)
-    _LOGGER.info(f"Writing cluster information to {args.cluster_output_path}.")
+    _LOGGER.info(
+        "Writing cluster information to %s.", args.cluster_output_path
+    )
     cluster_df.to_excel(args.cluster_output_path, index=False)
 
 
@@ -347,10 +603,12 @@ def do_summarize(args):
 
     :param argparse.Namespace args:  command-line arguments
     """
-    _LOGGER.info(f"Reading cluster input from {args.summarize_cluster_input}.")
+    _LOGGER.info(
+        "Reading cluster input from %s.", args.summarize_cluster_input
+    )
     cluster_df = pd.read_excel(args.summarize_cluster_input)
-    _LOGGER.info(f"Reading search input from {args.summarize_search_input}.")
-    search_df = pd.read_excel(args.summarize_search_input)
+    _LOGGER.info("Reading search input from %s.", args.summarize_search_input)
+    search_df = _read_results(args.summarize_search_input)
     cluster_df = cluster_df.merge(
         search_df, how="left", left_on="Cluster", right_on="PDB chain ID"
     )
@@ -366,7 +624,7 @@ def do_summarize(args):
         cluster_df, how="left", left_on="PDB chain ID", right_on="Chain"
     )
     df = df.drop(["Chain"], axis=1)
-    _LOGGER.info(f"Writing summary output to {args.summarize_output}.")
+    _LOGGER.info("Writing summary output to %s.", args.summarize_output)
     df.to_excel(args.summarize_output, index=False)
 
 
@@ -381,7 +639,7 @@ def main(args=None):
     else:
         args = parser.parse_args(args)
     logging.basicConfig(level=getattr(logging, args.log_level, "INFO"))
-    _LOGGER.debug(f"Got arguments: {args}.")
+    _LOGGER.debug("Got arguments: %s.", args)
     if hasattr(args, "do_search"):
         do_search(args)
     elif hasattr(args, "do_blast"):
@@ -1,11 +1,15 @@
 """Manage BLAST calculations on sequences."""
 import logging
+import os
 import subprocess
 import shutil
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from typing import Iterator
 from Bio import SeqIO
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
@@ -24,39 +28,80 @@ BLAST_BUILD_CMD_FMT = (
 BLAST_QUERY_CMD_FMT = (
     "docker run --rm -v {work_dir}:/work ncbi/blast "
     "blastp -query /work/{sequence_file} -max_hsps 1 -db /work/{db_file} "
-    "-outfmt 5 -out /work/{output_file}"
+    "-outfmt 5 -out /work/{output_file} -num_threads 1"
 )
+PLAST_EXECUTABLE = "plast"
+PLAST_QUERY_CMD_FMT = (
+    "{executable} -p plastp -i {sequence_file} -d {sequence_file} "
+    "-o {output_file} -a {num_threads}"
+)
+PLAST_COLUMNS = [
+    "Query",
+    "Subject",
+    "Percent identity",
+    "Alignment length",
+    "Mismatches",
+    "Gap openings",
+    "Query start",
+    "Query end",
+    "Subject start",
+    "Subject end",
+    "E-value",
+    "Bits",
+]
+ENGINES = ["blastp", "plastp"]
 OUTPUT_FILE = "output.xml"
+CHUNK_OUTPUT_FILE = "output.{ichunk}.xml"
+CHUNK_SEQUENCE_FILE = "sequences.{ichunk}.fasta"
+ITERATIONS_OPEN = "<BlastOutput_iterations>"
+ITERATIONS_CLOSE = "</BlastOutput_iterations>"
+PLAST_OUTPUT_FILE = "output.tsv"
 SEQUENCE_FILE = "sequences.fasta"
 DB_FILE = "blastdb"
+TMPDIR_ENV = "GO2PDB_TMPDIR"
+
 
+def temporary_directory() -> TemporaryDirectory:
+    """Create a temporary directory for BLAST files.
 
-def build_fasta(search_df) -> str:
-    """Build a FASTA file from the sequences in search_df.
+    The directory is created under the path in the GO2PDB_TMPDIR environment
+    variable, if set and non-empty, and the system default otherwise. The
+    path is made absolute since docker rejects relative bind mounts.
+
+    :returns:  temporary directory (use as a context manager)
+    """
+    temp_root = os.environ.get(TMPDIR_ENV)
+    if temp_root:
+        temp_root = os.path.abspath(temp_root)
+    else:
+        temp_root = None
+    return TemporaryDirectory(dir=temp_root)
+
+
+def build_fasta(search_df) -> Iterator[str]:
+    """Build FASTA records from the sequences in search_df.
 
     :param pd.DataFrame search_df:  dataframe with sequences
-    :returns:  string with FASTA data
+    :yields:  string with FASTA data for each sequence
     """
-    fasta = ""
     search_df = search_df[["PDB chain ID", "PDB strand sequence",]]
     search_df = search_df.drop_duplicates()
-    for _, row in search_df.iterrows():
-        chain_id = row["PDB chain ID"]
-        sequence = row["PDB strand sequence"]
+    for chain_id, sequence in search_df.itertuples(index=False, name=None):
         description = f"{chain_id}"
-        _LOGGER.debug(f"Processing {description}...")
+        _LOGGER.debug("Processing %s...", description)
         try:
             seq = Seq(sequence)
         except TypeError:
             _LOGGER.warning(
-                f"Failed to parse sequence {sequence} for {description} from "
-                f"{chain_id}. This often happens when entries are withdrawn "
-                f"from the PDB."
+                "Failed to parse sequence %s for %s from %s. This often "
+                "happens when entries are withdrawn from the PDB.",
+                sequence,
+                description,
+                chain_id,
             )
             seq = None
         if seq is not None:
-            fasta += SeqRecord(seq, id=description).format("fasta")
-    return fasta
+            yield SeqRecord(seq, id=description).format("fasta")
 
 
 def build_db(sequence_file, blast_dir):
@@ -66,10 +111,10 @@ def build_db(sequence_file, blast_dir):
     :param Path blast_dir:  directory for BLAST results
     """
     # The temporary directory fixes problems with spaces in paths
-    with TemporaryDirectory() as temp_dir:
+    with temporary_directory() as temp_dir:
         temp_dir = Path(temp_dir)
         _LOGGER.debug(
-            f"Using temporary directory {temp_dir} to build BLAST database."
+            "Using temporary directory %s to build BLAST database.", temp_dir
         )
         shutil.copy(sequence_file.resolve(), Path(temp_dir) / SEQUENCE_FILE)
         build_cmd = BLAST_BUILD_CMD_FMT.format(
@@ -83,41 +128,201 @@ def build_db(sequence_file, blast_dir):
         )
         complete.check_returncode()
         for db_file in temp_dir.glob(f"{DB_FILE}*"):
-            _LOGGER.debug(f"Copying {db_file} to {blast_dir}.")
+            _LOGGER.debug("Copying %s to %s.", db_file, blast_dir)
             shutil.copy(db_file.resolve(), blast_dir.resolve())
 
 
-def run_query(sequence_file, blast_dir):
-    """Build the BLAST database.
+def merge_xml(xml_paths, output_path):
+    """Merge BLAST XML outputs by concatenating their iterations.
+
+    The header and footer are taken from the first and last files,
+    respectively.
+
+    :param list xml_paths:  paths to XML-format BLAST outputs
+    :param Path output_path:  path for merged XML-format output
+    """
+    with open(output_path, "wt") as output_file:
+        for ixml, xml_path in enumerate(xml_paths):
+            with open(xml_path, "rt") as xml_file:
+                xml = xml_file.read()
+            start = xml.index(ITERATIONS_OPEN) + len(ITERATIONS_OPEN)
+            end = xml.index(ITERATIONS_CLOSE)
+            if ixml == 0:
+                output_file.write(xml[:start])
+            output_file.write(xml[start:end])
+            if ixml == len(xml_paths) - 1:
+                output_file.write(xml[end:])
+
+
+def split_records(records, num_chunks) -> list:
+    """Split records into contiguous, non-empty chunks of nearly equal size.
+
+    :param list records:  records to split
+    :param int num_chunks:  maximum number of chunks
+    :returns:  list of chunks (lists of records); at least one chunk
+    """
+    num_chunks = max(1, min(num_chunks, len(records)))
+    chunk_size, num_larger = divmod(len(records), num_chunks)
+    chunks = []
+    start = 0
+    for ichunk in range(num_chunks):
+        end = start + chunk_size + (1 if ichunk < num_larger else 0)
+        chunks.append(records[start:end])
+        start = end
+    return chunks
+
+
+def run_query(sequence_file, blast_dir, num_workers=None):
+    """Query the BLAST database with the sequences.
+
+    The sequences are split into roughly equal chunks which are run as
+    parallel single-threaded BLAST queries against the same database.
 
     :param str sequence_file:  path to FASTA file with sequences for DB
     :param str blast_dir:  directory for BLAST results
+    :param int num_workers:  number of parallel queries (default: all CPUs)
     """
+    if num_workers is None:
+        num_workers = os.cpu_count()
+    with open(sequence_file, "rt") as fasta_file:
+        records = list(SeqIO.parse(fasta_file, "fasta"))
+    chunks = split_records(records, num_workers)
     # The temporary directory fixes problems with spaces in paths
-    with TemporaryDirectory() as temp_dir:
+    with temporary_directory() as temp_dir:
         temp_dir = Path(temp_dir)
-        _LOGGER.debug(f"Using temporary directory {temp_dir} to run BLAST.")
-        shutil.copy(sequence_file.resolve(), Path(temp_dir) / SEQUENCE_FILE)
+        _LOGGER.debug("Using temporary directory %s to run BLAST.", temp_dir)
         for db_file in blast_dir.glob(f"{DB_FILE}*"):
             shutil.copy(db_file.resolve(), temp_dir.resolve())
-        query_cmd = BLAST_QUERY_CMD_FMT.format(
-            work_dir=temp_dir,
+        query_cmds = []
+        output_files = []
+        for ichunk, chunk in enumerate(chunks):
+            chunk_file = CHUNK_SEQUENCE_FILE.format(ichunk=ichunk)
+            SeqIO.write(chunk, temp_dir / Path(chunk_file), "fasta")
+            output_file = CHUNK_OUTPUT_FILE.format(ichunk=ichunk)
+            output_files.append(temp_dir / Path(output_file))
+            query_cmd = BLAST_QUERY_CMD_FMT.format(
+                work_dir=temp_dir,
+                sequence_file=chunk_file,
+                db_file=DB_FILE,
+                output_file=output_file,
+            )
+            query_cmds.append(query_cmd.split())
+        _LOGGER.debug("Running %d BLAST queries in parallel.", len(chunks))
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            run = partial(
+                subprocess.run,
+                check=True,
+                timeout=BLAST_TIMEOUT,
+                universal_newlines=True,
+            )
+            for complete in executor.map(run, query_cmds):
+                complete.check_returncode()
+        output_file = Path(temp_dir) / Path(OUTPUT_FILE)
+        merge_xml(output_files, output_file)
+        _LOGGER.debug("Copying %s to %s.", output_file, blast_dir)
+        shutil.copy(output_file.resolve(), blast_dir.resolve())
+
+
+def run_plast(sequence_file, blast_dir, num_threads=None):
+    """Run an all-vs-all PLAST query on the sequences.
+
+    PLAST uses the FASTA file directly as its database.
+
+    :param Path sequence_file:  path to FASTA file with sequences
+    :param Path blast_dir:  directory for PLAST results
+    :param int num_threads:  number of PLAST threads (default: all CPUs)
+    """
+    if num_threads is None:
+        num_threads = os.cpu_count()
+    # The temporary directory fixes problems with spaces in paths
+    with temporary_directory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        _LOGGER.debug("Using temporary directory %s to run PLAST.", temp_dir)
+        shutil.copy(sequence_file.resolve(), Path(temp_dir) / SEQUENCE_FILE)
+        query_cmd = PLAST_QUERY_CMD_FMT.format(
+            executable=PLAST_EXECUTABLE,
             sequence_file=SEQUENCE_FILE,
-            db_file=DB_FILE,
-            output_file=OUTPUT_FILE,
+            output_file=PLAST_OUTPUT_FILE,
+            num_threads=num_threads,
         )
         complete = subprocess.run(
             query_cmd.split(),
+            cwd=temp_dir,
             check=True,
             timeout=BLAST_TIMEOUT,
             universal_newlines=True,
         )
         complete.check_returncode()
-        output_file = Path(temp_dir) / Path(OUTPUT_FILE)
-        _LOGGER.debug(f"Copying {output_file} to {blast_dir}.")
+        output_file = Path(temp_dir) / Path(PLAST_OUTPUT_FILE)
+        _LOGGER.debug("Copying %s to %s.", output_file, blast_dir)
         shutil.copy(output_file.resolve(), blast_dir.resolve())
 
 
+def process_plast(
+    blast_dir, fasta_path, identity_cutoff, similarity_cutoff
+) -> pd.DataFrame:
+    """Process tabular PLAST results.
+
+    PLAST tabular output does not report positives so similarity is
+    approximated by identity; sequence lengths are taken from the FASTA file.
+
+    :param str blast_dir:  directory with PLAST results.
+    :param str fasta_path:  path to FASTA file with query sequences
+    :param float identity_cutoff:  keep hit if either identity or similarity
+        are above cutoff
+    :param float similarity_cutoff:  keep hit if either identity or similarity
+        are above cutoff
+    :returns:  DataFrame of results in the same format as
+        :func:`process_blast`
+    """
+    with open(fasta_path, "rt") as fasta_file:
+        lengths = {
+            record.id: len(record.seq)
+            for record in SeqIO.parse(fasta_file, "fasta")
+        }
+    plast_df = pd.read_csv(
+        Path(blast_dir) / Path(PLAST_OUTPUT_FILE),
+        sep="\t",
+        header=None,
+        names=PLAST_COLUMNS,
+    )
+    # Keep only the best HSP for each pair (equivalent to -max_hsps 1)
+    plast_df = plast_df.sort_values("Bits", ascending=False, kind="stable")
+    plast_df = plast_df.drop_duplicates(["Query", "Subject"]).sort_index()
+    query_length = plast_df["Query"].map(lengths)
+    target_length = plast_df["Subject"].map(lengths)
+    identities = (
+        (plast_df["Percent identity"] * plast_df["Alignment length"] / 100)
+        .round()
+        .astype(int)
+    )
+    max_length = np.maximum(query_length, target_length)
+    identity = identities / max_length
+    df = pd.DataFrame(
+        {
+            "Source": plast_df["Query"],
+            "Target": plast_df["Subject"],
+            "Query length": query_length,
+            "Alignment length": target_length,
+            "Alignment score": None,
+            "Alignment bits": plast_df["Bits"],
+            "Alignment e-value": plast_df["E-value"],
+            "Alignment identities": identities,
+            "Alignment positives": identities,
+            "Alignment gaps": None,
+            "Alignment frac. identity": identity,
+            "Alignment frac. similarity": identity,
+        }
+    )
+    df = df[
+        (df["Alignment frac. identity"] >= identity_cutoff)
+        | (df["Alignment frac. similarity"] >= similarity_cutoff)
+    ]
+    df = df[df["Source"] != df["Target"]]
+    df = df.reset_index(drop=True)
+    return df
+
+
 def process_blast(
     blast_dir, identity_cutoff, similarity_cutoff
 ) -> pd.DataFrame:
@@ -142,7 +347,7 @@ def process_blast(
                 align_id = f"{pdb_id}_{chain_id}"
                 if len(alignment.hsps) > 1:
                     _LOGGER.warning(
-                        f"Ignoring extra alignments for {query_id}."
+                        "Ignoring extra alignments for %s.", query_id
                     )
                 hsp = alignment.hsps[0]
                 identity = hsp.identities / max(query_length, alignment.length)
@@ -173,8 +378,32 @@ def process_blast(
     return df
 
 
+def resolve_engine(engine) -> str:
+    """Determine the alignment engine that will actually be used.
+
+    :param str engine:  requested alignment engine (one of ENGINES)
+    :returns:  engine, with plastp replaced by blastp if PLAST is not
+        installed
+    :raises ValueError:  if the engine is unknown
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown alignment engine: {engine}.")
+    if engine == "plastp" and shutil.which(PLAST_EXECUTABLE) is None:
+        _LOGGER.warning(
+            "Unable to find %s in path; using blastp.", PLAST_EXECUTABLE
+        )
+        engine = "blastp"
+    return engine
+
+
 def run_blast(
-    fasta_path, blast_dir, identity_cutoff, similarity_cutoff, save_output=None
+    fasta_path,
+    blast_dir,
+    identity_cutoff,
+    similarity_cutoff,
+    save_output=None,
+    engine="blastp",
+    num_workers=None,
 ) -> pd.DataFrame:
     """Run all-vs-all BLAST on FASTA files.
 
@@ -184,23 +413,40 @@ def run_blast(
         are above cutoff
     :param float similarity_cutoff:  keep hit if either identity or similarity
         are above cutoff
-    :param Path save_output:  path to save XML-format BLAST output (can be 
-        None)
+    :param Path save_output:  path to save raw BLAST output (can be None);
+        XML-format for blastp and tabular for plastp
+    :param str engine:  alignment engine (one of ENGINES); plastp falls back
+        to blastp if PLAST is not installed
+    :param int num_workers:  number of parallel BLAST queries or PLAST
+        threads (default: all CPUs)
     :returns:  DataFrame with BLAST results
+    :raises ValueError:  if the engine is unknown
     """
+    engine = resolve_engine(engine)
     fasta_path = Path(fasta_path)
     blast_dir = Path(blast_dir)
     _LOGGER.info(
-        f"Querying BLAST database in {blast_dir} with sequences from "
-        f"{fasta_path}."
+        "Querying %s database in %s with sequences from %s.",
+        engine,
+        blast_dir,
+        fasta_path,
     )
-    run_query(fasta_path, blast_dir)
+    if engine == "plastp":
+        run_plast(fasta_path, blast_dir, num_threads=num_workers)
+        output_path = blast_dir / Path(PLAST_OUTPUT_FILE)
+    else:
+        run_query(fasta_path, blast_dir, num_workers=num_workers)
+        output_path = blast_dir / Path(OUTPUT_FILE)
     if save_output is not None:
-        output_path = blast_dir / Path("output.xml")
         save_output = Path(save_output)
-        _LOGGER.info(f"Saving raw BLAST output to {save_output}.")
+        _LOGGER.info("Saving raw %s output to %s.", engine, save_output)
         shutil.copy(output_path.resolve(), save_output.resolve())
-    _LOGGER.info(f"Processing BLAST results in {blast_dir}.")
-    df = process_blast(blast_dir, identity_cutoff, similarity_cutoff)
-    _LOGGER.info(f"Found {len(df)} matches.")
+    _LOGGER.info("Processing %s results in %s.", engine, blast_dir)
+    if engine == "plastp":
+        df = process_plast(
+            blast_dir, fasta_path, identity_cutoff, similarity_cutoff
+        )
+    else:
+        df = process_blast(blast_dir, identity_cutoff, similarity_cutoff)
+    _LOGGER.info("Found %d matches.", len(df))
     return df
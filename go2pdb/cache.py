@@ -0,0 +1,134 @@
+"""Cache results of network lookups on disk."""
+import logging
+import pandas as pd
+from . import pdb
+from .go import uniprot
+
+
+_LOGGER = logging.getLogger(__name__)
+CACHE_TTL_DAYS = 30
+SECONDS_PER_DAY = 86400
+
+
+def open_cache(cache_dir, ttl_days):
+    """Open the on-disk cache.
+
+    :param Path cache_dir:  directory for cache files
+    :param float ttl_days:  lifetime of cache entries in days
+    :returns:  diskcache.Cache object or None if caching is disabled or the
+        diskcache package is not installed
+    """
+    if ttl_days <= 0:
+        return None
+    try:
+        import diskcache
+    except ImportError:
+        _LOGGER.debug("diskcache not available; not caching results.")
+        return None
+    return diskcache.Cache(str(cache_dir))
+
+
+def _lookup(cache, function_name, keys) -> tuple:
+    """Look up keys in the cache.
+
+    :param diskcache.Cache cache:  open cache
+    :param str function_name:  name of the cached function
+    :param list keys:  keys to look up
+    :returns:  (dictionary of cached values, list of missing keys)
+    """
+    hits = {}
+    misses = []
+    for key in keys:
+        value = cache.get((function_name, key))
+        if value is None:
+            misses.append(key)
+        else:
+            hits[key] = value
+    _LOGGER.debug(
+        "Found %d of %d %s entries in cache.",
+        len(hits),
+        len(keys),
+        function_name,
+    )
+    return hits, misses
+
+
+def _store(cache, function_name, values, ttl_days):
+    """Store values in the cache.
+
+    :param diskcache.Cache cache:  open cache
+    :param str function_name:  name of the cached function
+    :param dict values:  values to store, indexed by key
+    :param float ttl_days:  lifetime of cache entries in days
+    """
+    for key, value in values.items():
+        cache.set(
+            (function_name, key), value, expire=ttl_days * SECONDS_PER_DAY
+        )
+
+
+def metadata(
+    pdb_ids, ssl_verify, cache_dir, ttl_days=CACHE_TTL_DAYS
+) -> pd.DataFrame:
+    """Get metadata for PDB IDs, only fetching IDs that are not cached.
+
+    :param list pdb_ids:  list of PDB IDs
+    :param bool ssl_verify:  does SSL work?
+    :param Path cache_dir:  directory for cache files
+    :param float ttl_days:  lifetime of cache entries in days (zero to
+        disable caching)
+    :returns:  DataFrame with metadata (see :func:`go2pdb.pdb.metadata`)
+    """
+    cache = open_cache(cache_dir, ttl_days)
+    if cache is None:
+        return pdb.metadata(pdb_ids, ssl_verify=ssl_verify)
+    pdb_ids = sorted({pdb_id.upper() for pdb_id in pdb_ids})
+    with cache:
+        hits, misses = _lookup(cache, "metadata", pdb_ids)
+        if misses:
+            # IDs without usable entries are cached as empty lists
+            fetched = {pdb_id: [] for pdb_id in misses}
+            miss_df = pdb.metadata(misses, ssl_verify=ssl_verify)
+            for row in miss_df.to_dict("records"):
+                fetched.setdefault(row["PDB ID"].upper(), []).append(row)
+            _store(cache, "metadata", fetched, ttl_days)
+            hits.update(fetched)
+    rows = [row for pdb_id in sorted(hits) for row in hits[pdb_id]]
+    return pd.DataFrame(rows)
+
+
+def get_pdb_ids(
+    uniprot_ids, ssl_verify, cache_dir, ttl_days=CACHE_TTL_DAYS
+) -> pd.DataFrame:
+    """Get PDB IDs for UniProt IDs, only fetching IDs that are not cached.
+
+    :param list uniprot_ids:  list of UniProt IDs.
+    :param bool ssl_verify:  does SSL work?
+    :param Path cache_dir:  directory for cache files
+    :param float ttl_days:  lifetime of cache entries in days (zero to
+        disable caching)
+    :returns:  mapping of UniProt IDs to PDB IDs.
+    """
+    cache = open_cache(cache_dir, ttl_days)
+    if cache is None:
+        return uniprot.get_pdb_ids(uniprot_ids, ssl_verify=ssl_verify)
+    uniprot_ids = list(dict.fromkeys(uniprot_ids))
+    with cache:
+        hits, misses = _lookup(cache, "get_pdb_ids", uniprot_ids)
+        if misses:
+            # IDs without PDB structures are cached as empty lists
+            fetched = {uniprot_id: [] for uniprot_id in misses}
+            miss_df = uniprot.get_pdb_ids(misses, ssl_verify=ssl_verify)
+            for uniprot_id, pdb_id in miss_df.itertuples(
+                index=False, name=None
+            ):
+                fetched.setdefault(uniprot_id, []).append(pdb_id)
+            _store(cache, "get_pdb_ids", fetched, ttl_days)
+            hits.update(fetched)
+    rows = [
+        (uniprot_id, pdb_id)
+        for uniprot_id in uniprot_ids
+        for pdb_id in hits.get(uniprot_id, [])
+    ]
+    df = pd.DataFrame(data=rows, columns=["UniProt entry ID", "PDB ID"])
+    return df.drop_duplicates(ignore_index=True)
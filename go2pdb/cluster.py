@@ -1,7 +1,6 @@
 """Cluster sequences/structures based on BLAST results."""
 import logging
 from hashlib import sha1
-from subprocess import NORMAL_PRIORITY_CLASS
 import pandas as pd
 
 
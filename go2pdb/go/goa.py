@@ -82,8 +82,9 @@ def compare_mtime(ftp, gzip_file, ftp_filename) -> bool:
     local_mtime = date.fromtimestamp(gzip_file.mtime)
     if mtime_dict[ftp_filename] > local_mtime:
         _LOGGER.debug(
-            f"Remote file date {mtime_dict[ftp_filename]} is newer than "
-            f"the local file date {local_mtime}."
+            "Remote file date %s is newer than the local file date %s.",
+            mtime_dict[ftp_filename],
+            local_mtime,
         )
         return True
     return False
@@ -103,21 +104,23 @@ def check_fetch(
     :param str ftp_filename:  name of GOA file on FTP server
     """
     ftp = FTP(ftp_server)
-    _LOGGER.debug(f"Logging into {ftp_dir}.")
+    _LOGGER.debug("Logging into %s.", ftp_dir)
     ftp.login()
-    _LOGGER.debug(f"Changing directory to {ftp_dir}.")
+    _LOGGER.debug("Changing directory to %s.", ftp_dir)
     ftp.cwd(ftp_dir)
     download = None
     if local_path.exists():
-        _LOGGER.debug(f"Comparing mtimes of remote and local files.")
+        _LOGGER.debug("Comparing mtimes of remote and local files.")
         with gzip.GzipFile(local_path, "r") as gzip_file:
             download = compare_mtime(ftp, gzip_file, ftp_filename)
     else:
-        _LOGGER.info(f"Local file {local_path} does not exist.")
+        _LOGGER.info("Local file %s does not exist.", local_path)
         download = True
     if download:
-        _LOGGER.info(f"Downloading file.")
-        _LOGGER.info(f"Fetching {ftp_filename} from {ftp_server}/{ftp_dir}.")
+        _LOGGER.info("Downloading file.")
+        _LOGGER.info(
+            "Fetching %s from %s/%s.", ftp_filename, ftp_server, ftp_dir
+        )
         with open(local_path, "wb") as gzip_file:
             ftp.retrbinary(f"RETR {ftp_filename}", gzip_file.write)
 
@@ -129,7 +132,7 @@ def extract(local_path, go_codes) -> pd.DataFrame:
     :param list go_codes:  GO codes to search for
     :returns:  set of matching PDB IDs
     """
-    _LOGGER.debug(f"Reading {local_path}.")
+    _LOGGER.debug("Reading %s.", local_path)
     rows = []
     with gzip.open(local_path, "rt") as gzip_file:
         for line in gzip_file:
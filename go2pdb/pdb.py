@@ -1,6 +1,8 @@
 """Routines for fetching things from the PDB website."""
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from os import access
 from pathlib import Path
 from datetime import date
@@ -15,6 +17,7 @@ PDB_PDB_URL = "https://files.rcsb.org/download/{pdb_id}.pdb"
 PDB_CIF_URL = "https://files.rcsb.org/download/{pdb_id}.cif"
 PDB_SEARCH_URL = "https://search.rcsb.org/rcsbsearch/v1/query?json={query}"
 CHUNK_SIZE = 180
+MAX_WORKERS = 8
 GRAPHQL_URL = "https://data.rcsb.org/graphql"
 GRAPHQL_QUERY = (
     "{{"
@@ -72,81 +75,98 @@ def keyword_search(keyword, ssl_verify) -> pd.DataFrame:
     return df
 
 
-def metadata(pdb_ids, ssl_verify) -> pd.DataFrame:
-    """Get metadata for PDB IDs.
+def _metadata_chunk(id_list, ssl_verify) -> list:
+    """Get metadata rows for a single chunk of PDB IDs.
 
-    :param list pdb_ids:  list of PDB IDs
+    :param list id_list:  list of PDB IDs (at most CHUNK_SIZE long)
     :param bool ssl_verify:  does SSL work?
-    :returns:  DataFrame with metadata
+    :returns:  list of metadata rows (dictionaries)
     """
-    pdb_ids = sorted(list(pdb_ids))
     rows = []
-    for id_list in [
-        pdb_ids[i : i + CHUNK_SIZE] for i in range(0, len(pdb_ids), CHUNK_SIZE)
-    ]:
-        _LOGGER.debug(f"Fetching metadata for {id_list}.")
-        query = GRAPHQL_QUERY.format(pdb_ids=id_list)
-        query = query.replace("'", '"')
-        req = requests.get(
-            GRAPHQL_URL, params={"query": query}, verify=ssl_verify
-        )
-        results = req.json()
-        for result in results["data"]["entries"]:
-            pdb_id = result.pop("rcsb_id")
-            struct = result.pop("struct")
-            descriptor = struct.pop("pdbx_descriptor")
-            accession = result.pop("rcsb_accession_info")
-            dep_date = accession.pop("deposit_date")
-            dep_date, _ = dep_date.split("T")
-            dep_date = date.fromisoformat(dep_date)
-            title = struct.pop("title")
-            experiments = result.pop("exptl")
-            if len(experiments) > 1:
+    _LOGGER.debug("Fetching metadata for %s.", id_list)
+    query = GRAPHQL_QUERY.format(pdb_ids=id_list)
+    query = query.replace("'", '"')
+    req = requests.get(GRAPHQL_URL, params={"query": query}, verify=ssl_verify)
+    results = req.json()
+    for result in results["data"]["entries"]:
+        pdb_id = result.pop("rcsb_id")
+        struct = result.pop("struct")
+        descriptor = struct.pop("pdbx_descriptor")
+        accession = result.pop("rcsb_accession_info")
+        dep_date = accession.pop("deposit_date")
+        dep_date, _ = dep_date.split("T")
+        dep_date = date.fromisoformat(dep_date)
+        title = struct.pop("title")
+        experiments = result.pop("exptl")
+        if len(experiments) > 1:
+            _LOGGER.warning(
+                "Only using first experiment of %s for annotation.", pdb_id
+            )
+        experiment = experiments[0]
+        method = experiment.pop("method")
+        refinements = result.pop("refine")
+        if refinements is not None:
+            if len(refinements) > 1:
                 _LOGGER.warning(
-                    f"Only using first experiment of {pdb_id} for annotation."
+                    "Only using first refinement of %s for annotation.", pdb_id
                 )
-            experiment = experiments[0]
-            method = experiment.pop("method")
-            refinements = result.pop("refine")
-            if refinements is not None:
-                if len(refinements) > 1:
+            refinement = refinements[0]
+            resolution = refinement.pop("ls_d_res_high")
+        else:
+            resolution = None
+        for polymer in result.pop("polymer_entities"):
+            chain_id = polymer.pop("rcsb_id")
+            entity = polymer.pop("entity_poly")
+            strand_ids = entity.pop("pdbx_strand_id")
+            strand_type = entity.pop("rcsb_entity_polymer_type")
+            sequence = entity.pop("pdbx_seq_one_letter_code_can")
+            if not sequence.isalpha():
+                sequence = None
+            uniprots = polymer.pop("uniprots")
+            if uniprots is not None:
+                if len(uniprots) > 1:
                     _LOGGER.warning(
-                        f"Only using first refinement of {pdb_id} for annotation."
+                        "Only using first UniProt ID of %s for annotation",
+                        pdb_id,
                     )
-                refinement = refinements[0]
-                resolution = refinement.pop("ls_d_res_high")
+                uniprot = uniprots[0].pop("rcsb_id")
             else:
-                resolution = None
-            for polymer in result.pop("polymer_entities"):
-                chain_id = polymer.pop("rcsb_id")
-                entity = polymer.pop("entity_poly")
-                strand_ids = entity.pop("pdbx_strand_id")
-                strand_type = entity.pop("rcsb_entity_polymer_type")
-                sequence = entity.pop("pdbx_seq_one_letter_code_can")
-                if not sequence.isalpha():
-                    sequence = None
-                uniprots = polymer.pop("uniprots")
-                if uniprots is not None:
-                    if len(uniprots) > 1:
-                        _LOGGER.warning(
-                            f"Only using first UniProt ID of {pdb_id} for annotation"
-                        )
-                    uniprot = uniprots[0].pop("rcsb_id")
-                else:
-                    uniprot = None
-                row = {
-                    "PDB ID": pdb_id,
-                    "PDB deposit date": dep_date,
-                    "PDB method": method,
-                    "PDB resolution (A)": resolution,
-                    "PDB description": descriptor,
-                    "PDB title": title,
-                    "PDB chain ID": chain_id,
-                    "PDB strand ID(s)": strand_ids,
-                    "PDB strand type": strand_type,
-                    "PDB strand sequence": sequence,
-                    "PDB strand UniProt": uniprot,
-                }
-                if sequence is not None:
-                    rows.append(row)
+                uniprot = None
+            row = {
+                "PDB ID": pdb_id,
+                "PDB deposit date": dep_date,
+                "PDB method": method,
+                "PDB resolution (A)": resolution,
+                "PDB description": descriptor,
+                "PDB title": title,
+                "PDB chain ID": chain_id,
+                "PDB strand ID(s)": strand_ids,
+                "PDB strand type": strand_type,
+                "PDB strand sequence": sequence,
+                "PDB strand UniProt": uniprot,
+            }
+            if sequence is not None:
+                rows.append(row)
+    return rows
+
+
+def metadata(pdb_ids, ssl_verify) -> pd.DataFrame:
+    """Get metadata for PDB IDs.
+
+    Chunks of PDB IDs are fetched concurrently.
+
+    :param list pdb_ids:  list of PDB IDs
+    :param bool ssl_verify:  does SSL work?
+    :returns:  DataFrame with metadata
+    """
+    pdb_ids = sorted(list(pdb_ids))
+    chunks = [
+        pdb_ids[i : i + CHUNK_SIZE] for i in range(0, len(pdb_ids), CHUNK_SIZE)
+    ]
+    rows = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for chunk_rows in executor.map(
+            partial(_metadata_chunk, ssl_verify=ssl_verify), chunks
+        ):
+            rows += chunk_rows
     return pd.DataFrame(rows)
@@ -27,6 +27,7 @@ setuptools.setup(
         "numpy",
         "mmcif_pdbx",
     ],
+    extras_require={"fast": ["rustpy-xlsxwriter", "pyarrow", "diskcache"]},
     tests_require=["pytest"],
     entry_points={"console_scripts": ["go2pdb=go2pdb.__main__:main"]},
     keywords="science chemistry biophysics biochemistry",
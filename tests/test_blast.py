@@ -0,0 +1,127 @@
+"""Test BLAST helper routines."""
+import os
+import tempfile
+import pytest
+from Bio.Blast import NCBIXML
+from go2pdb import blast
+
+
+XML_FMT = """<?xml version="1.0"?>
+<BlastOutput>
+  <BlastOutput_program>blastp</BlastOutput_program>
+  <BlastOutput_version>BLASTP 2.12.0+</BlastOutput_version>
+  <BlastOutput_reference>reference</BlastOutput_reference>
+  <BlastOutput_db>blastdb</BlastOutput_db>
+  <BlastOutput_query-ID>Query_1</BlastOutput_query-ID>
+  <BlastOutput_query-def>{query}</BlastOutput_query-def>
+  <BlastOutput_query-len>3</BlastOutput_query-len>
+  <BlastOutput_param>
+    <Parameters>
+      <Parameters_matrix>BLOSUM62</Parameters_matrix>
+      <Parameters_expect>10</Parameters_expect>
+      <Parameters_gap-open>11</Parameters_gap-open>
+      <Parameters_gap-extend>1</Parameters_gap-extend>
+      <Parameters_filter>F</Parameters_filter>
+    </Parameters>
+  </BlastOutput_param>
+<BlastOutput_iterations>
+<Iteration>
+  <Iteration_iter-num>1</Iteration_iter-num>
+  <Iteration_query-ID>Query_1</Iteration_query-ID>
+  <Iteration_query-def>{query}</Iteration_query-def>
+  <Iteration_query-len>3</Iteration_query-len>
+  <Iteration_hits>
+  </Iteration_hits>
+</Iteration>
+</BlastOutput_iterations>
+</BlastOutput>
+"""
+
+
+@pytest.mark.parametrize(
+    "num_records,num_chunks",
+    [(9, 4), (17, 16), (3, 8), (8, 8), (1, 1), (0, 4)],
+)
+def test_split_records(num_records, num_chunks):
+    """Test that chunks are contiguous, non-empty, and nearly equal."""
+    records = list(range(num_records))
+    chunks = blast.split_records(records, num_chunks)
+    assert len(chunks) == max(1, min(num_records, num_chunks))
+    assert [r for chunk in chunks for r in chunk] == records
+    sizes = [len(chunk) for chunk in chunks]
+    if num_records > 0:
+        assert min(sizes) > 0
+    assert max(sizes) - min(sizes) <= 1
+
+
+def test_merge_xml(tmp_path):
+    """Test that merged XML contains the iterations of every input."""
+    queries = ["1ABC_1", "2DEF_1", "3GHI_1"]
+    xml_paths = []
+    for iquery, query in enumerate(queries):
+        xml_path = tmp_path / f"output.{iquery}.xml"
+        xml_path.write_text(XML_FMT.format(query=query))
+        xml_paths.append(xml_path)
+    output_path = tmp_path / "output.xml"
+    blast.merge_xml(xml_paths, output_path)
+    with open(output_path) as xml_file:
+        records = list(NCBIXML.parse(xml_file))
+    assert [record.query for record in records] == queries
+
+
+def test_process_plast(tmp_path):
+    """Test parsing of tabular PLAST output."""
+    fasta_path = tmp_path / "sequences.fasta"
+    fasta_path.write_text(
+        ">1ABC_1\nMKVLAAGIVE\n>2DEF_1\nMKVLAAGI\n>3GHI_1\nWWWWWWWWWW\n"
+    )
+    rows = [
+        ("1ABC_1", "1ABC_1", 100.0, 10, 0, 0, 1, 10, 1, 10, 1e-10, 50.0),
+        ("1ABC_1", "2DEF_1", 50.0, 8, 4, 0, 1, 8, 1, 8, 1e-2, 20.0),
+        ("1ABC_1", "2DEF_1", 100.0, 8, 0, 0, 1, 8, 1, 8, 1e-8, 40.0),
+        ("1ABC_1", "3GHI_1", 20.0, 10, 8, 0, 1, 10, 1, 10, 5.0, 10.0),
+    ]
+    plast_path = tmp_path / blast.PLAST_OUTPUT_FILE
+    plast_path.write_text(
+        "".join("\t".join(str(v) for v in row) + "\n" for row in rows)
+    )
+    df = blast.process_plast(tmp_path, fasta_path, 0.5, 0.5)
+    assert len(df) == 1
+    row = df.iloc[0]
+    assert row["Source"] == "1ABC_1"
+    assert row["Target"] == "2DEF_1"
+    assert row["Query length"] == 10
+    assert row["Alignment length"] == 8
+    assert row["Alignment bits"] == 40.0
+    assert row["Alignment identities"] == 8
+    assert row["Alignment frac. identity"] == pytest.approx(0.8)
+    assert row["Alignment frac. similarity"] == pytest.approx(0.8)
+
+
+def test_resolve_engine(monkeypatch):
+    """Test fallback to blastp when PLAST is missing."""
+    monkeypatch.setattr(blast.shutil, "which", lambda name: None)
+    assert blast.resolve_engine("plastp") == "blastp"
+    assert blast.resolve_engine("blastp") == "blastp"
+    monkeypatch.setattr(blast.shutil, "which", lambda name: f"/bin/{name}")
+    assert blast.resolve_engine("plastp") == "plastp"
+    with pytest.raises(ValueError):
+        blast.resolve_engine("tblastn")
+
+
+def test_temporary_directory_relative(tmp_path, monkeypatch):
+    """Test that a relative GO2PDB_TMPDIR gives an absolute directory."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "reltmp").mkdir()
+    monkeypatch.setenv(blast.TMPDIR_ENV, "reltmp")
+    with blast.temporary_directory() as temp_dir:
+        assert os.path.isabs(temp_dir)
+        assert os.path.dirname(temp_dir) == str(tmp_path / "reltmp")
+
+
+def test_temporary_directory_empty(monkeypatch):
+    """Test that an empty GO2PDB_TMPDIR falls back to the system default."""
+    monkeypatch.setenv(blast.TMPDIR_ENV, "")
+    with blast.temporary_directory() as temp_dir:
+        assert os.path.isabs(temp_dir)
+        assert os.path.dirname(temp_dir) == tempfile.gettempdir()
@@ -0,0 +1,84 @@
+"""Test on-disk caching of network lookups."""
+import pandas as pd
+import pytest
+from go2pdb import cache
+from go2pdb.__main__ import build_parser
+
+
+pytest.importorskip("diskcache")
+
+
+@pytest.fixture
+def metadata_calls(monkeypatch):
+    """Stub pdb.metadata; 9ZZZ has no usable entries."""
+    calls = []
+
+    def metadata(pdb_ids, ssl_verify):
+        calls.append(sorted(pdb_ids))
+        rows = [
+            {"PDB ID": pdb_id, "PDB chain ID": f"{pdb_id}_1"}
+            for pdb_id in pdb_ids
+            if pdb_id != "9ZZZ"
+        ]
+        return pd.DataFrame(rows)
+
+    monkeypatch.setattr(cache.pdb, "metadata", metadata)
+    return calls
+
+
+@pytest.fixture
+def mapping_calls(monkeypatch):
+    """Stub uniprot.get_pdb_ids; Q99999 has no PDB structures."""
+    calls = []
+    mapping = {"P12345": ["1ABC", "2DEF"], "P67890": ["3GHI"]}
+
+    def get_pdb_ids(uniprot_ids, ssl_verify):
+        calls.append(list(uniprot_ids))
+        rows = [
+            (uniprot_id, pdb_id)
+            for uniprot_id in uniprot_ids
+            for pdb_id in mapping.get(uniprot_id, [])
+        ]
+        return pd.DataFrame(rows, columns=["UniProt entry ID", "PDB ID"])
+
+    monkeypatch.setattr(cache.uniprot, "get_pdb_ids", get_pdb_ids)
+    return calls
+
+
+def test_metadata_fetches_misses(tmp_path, metadata_calls):
+    """Test that only uncached PDB IDs are fetched."""
+    df = cache.metadata(["1ABC", "9ZZZ"], True, tmp_path)
+    assert list(df["PDB ID"]) == ["1ABC"]
+    df = cache.metadata(["1ABC", "2DEF", "9ZZZ"], True, tmp_path)
+    assert sorted(df["PDB ID"]) == ["1ABC", "2DEF"]
+    assert metadata_calls == [["1ABC", "9ZZZ"], ["2DEF"]]
+    cache.metadata(["2DEF", "9ZZZ"], True, tmp_path)
+    assert len(metadata_calls) == 2
+
+
+def test_get_pdb_ids_fetches_misses(tmp_path, mapping_calls):
+    """Test that only uncached UniProt IDs are fetched."""
+    df = cache.get_pdb_ids(["P12345", "Q99999"], True, tmp_path)
+    assert list(df["PDB ID"]) == ["1ABC", "2DEF"]
+    df = cache.get_pdb_ids(["P12345", "P67890", "Q99999"], True, tmp_path)
+    assert list(df.itertuples(index=False, name=None)) == [
+        ("P12345", "1ABC"),
+        ("P12345", "2DEF"),
+        ("P67890", "3GHI"),
+    ]
+    assert mapping_calls == [["P12345", "Q99999"], ["P67890"]]
+
+
+def test_zero_ttl_bypasses_cache(tmp_path, metadata_calls, mapping_calls):
+    """Test that --cache-ttl-days 0 disables the cache."""
+    args = build_parser().parse_args(
+        ["search", "--cache-ttl-days", "0", "GO:0016151"]
+    )
+    assert args.cache_ttl_days == 0
+    cache_dir = tmp_path / "cache"
+    for _ in range(2):
+        cache.metadata(["1ABC"], True, cache_dir, args.cache_ttl_days)
+        cache.get_pdb_ids(["P12345"], True, cache_dir, args.cache_ttl_days)
+    assert len(metadata_calls) == 2
+    assert len(mapping_calls) == 2
+    assert not cache_dir.exists()
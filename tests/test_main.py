@@ -0,0 +1,66 @@
+"""Test command-line helper routines."""
+import openpyxl
+import pandas as pd
+from go2pdb import blast
+from go2pdb.__main__ import _read_excel, _read_results, _write_results
+
+
+def test_read_excel_empty_cell(tmp_path):
+    """Test that empty cells are read as NaN and skipped in FASTA output."""
+    path = tmp_path / "search-output.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["PDB chain ID", "PDB strand sequence"])
+    sheet.append(["1ABC_1", "MKV"])
+    sheet.append(["2DEF_1", None])
+    workbook.save(path)
+    df = _read_excel(path)
+    assert list(df.columns) == ["PDB chain ID", "PDB strand sequence"]
+    assert pd.isna(df.loc[1, "PDB strand sequence"])
+    records = list(blast.build_fasta(df))
+    assert len(records) == 1
+    assert records[0].startswith(">1ABC_1")
+
+
+def test_read_results_parquet_missing(tmp_path):
+    """Test that missing values survive the Parquet round trip as NaN."""
+    path = tmp_path / "search-output.xlsx"
+    df = pd.DataFrame(
+        {
+            "PDB chain ID": ["1ABC_1", "2DEF_1"],
+            "PDB strand sequence": pd.Series(["MKV", None], dtype=object),
+        }
+    )
+    _write_results(df, path)
+    assert path.with_suffix(".parquet").exists()
+    df = _read_results(path)
+    assert pd.isna(df.loc[1, "PDB strand sequence"])
+    assert len(list(blast.build_fasta(df))) == 1
+
+
+def test_read_excel_matches_pandas(tmp_path):
+    """Test duplicate headers, cells beyond the header, and blank rows."""
+    path = tmp_path / "search-output.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["PDB ID", "PDB title", "PDB title", None, "PDB title.1"])
+    sheet.append(["1ABC", "first", "second", "x", "third", "extra"])
+    sheet.append(["2DEF", None, "fourth"])
+    sheet.append([None, None])
+    workbook.save(path)
+    df = _read_excel(path)
+    expected = pd.read_excel(path)
+    assert list(df.columns) == list(expected.columns)
+    assert list(df.columns) == [
+        "PDB ID",
+        "PDB title",
+        "PDB title.2",
+        "Unnamed: 3",
+        "PDB title.1",
+        "Unnamed: 5",
+    ]
+    assert df.shape == expected.shape
+    assert df.loc[0, "Unnamed: 5"] == "extra"
+    assert pd.isna(df.loc[1, "Unnamed: 5"])
+    assert df.loc[1, "PDB title.2"] == "fourth"
+    assert df.loc[0, "PDB title.1"] == "third"